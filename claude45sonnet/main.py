@@ -6,13 +6,367 @@ This script generates syntactically correct gcloud commands using Gemini 2.5 Pro
 and validates them using gcloud's built-in help system.
 """
 
+import asyncio
+import functools
+import logging
+import logging.handlers
+import os
+import pickle
+import sqlite3
 import subprocess
+import sys
 import json
 import re
+import threading
 from typing import Dict, List, Optional, Tuple
 import google.generativeai as genai
 
 
+# On-disk cache for `gcloud ... --help` output. Help text is static for a
+# given SDK version, so entries are keyed by (sdk_version, command) and
+# survive across runs; upgrading the SDK changes the key and invalidates them.
+# Verbose output goes through a buffered logger rather than print():
+# formatting is lazy (free when verbose is off) and records are flushed in
+# batches instead of one unbuffered terminal write per message
+_log = logging.getLogger('gcloud_cmdgen')
+
+
+def _enable_verbose_logging():
+    """Attach a buffered stdout handler to the module logger (idempotent)."""
+    if not _log.handlers:
+        target = logging.StreamHandler(sys.stdout)
+        target.setFormatter(logging.Formatter('%(message)s'))
+        _log.addHandler(logging.handlers.MemoryHandler(
+            capacity=100, flushLevel=logging.ERROR, target=target
+        ))
+        _log.setLevel(logging.DEBUG)
+
+
+# Patterns used on the hot path, compiled once at import
+_FLAG_RE = re.compile(r'--[\w-]+')
+_MD_FENCE_RE = re.compile(r'```(?:bash|shell)?\n?')
+_TRIPLE_BACKTICK_RE = re.compile(r'```')
+_SHELL_PREFIX_RE = re.compile(r'^[$#]\s*')
+
+# Flags accepted by every gcloud command; help text doesn't always list them
+_GCLOUD_WIDE_FLAGS = frozenset({
+    '--project', '--quiet', '--format', '--verbosity', '--account',
+    '--configuration', '--help',
+})
+
+
+@functools.lru_cache(maxsize=256)
+def _parse_help_flags(help_text: str) -> frozenset:
+    """
+    Extract the set of flags mentioned in a help text.
+
+    Args:
+        help_text: Output of 'gcloud <command> --help'
+
+    Returns:
+        Frozenset of flag names (including gcloud-wide flags)
+    """
+    return frozenset(_FLAG_RE.findall(help_text)) | _GCLOUD_WIDE_FLAGS
+
+_CACHE_DIR = os.path.join(
+    os.environ.get("XDG_CACHE_HOME", os.path.expanduser("~/.cache")), "gcloud_cmdgen"
+)
+_HELP_CACHE_FILE = os.path.join(_CACHE_DIR, "help_cache.db")
+_help_db: Optional[sqlite3.Connection] = None
+_help_db_lock = threading.Lock()
+
+
+def _help_cache_db() -> sqlite3.Connection:
+    global _help_db
+    if _help_db is None:
+        os.makedirs(_CACHE_DIR, exist_ok=True)
+        _help_db = sqlite3.connect(_HELP_CACHE_FILE, check_same_thread=False)
+        _help_db.execute(
+            "CREATE TABLE IF NOT EXISTS help_cache ("
+            "version TEXT, command TEXT, rc INTEGER, stdout TEXT, stderr TEXT, "
+            "PRIMARY KEY (version, command))"
+        )
+    return _help_db
+
+
+@functools.lru_cache(maxsize=1)
+def _gcloud_sdk_version() -> str:
+    """Return the installed SDK version string (used as the cache key)."""
+    try:
+        result = subprocess.run(
+            ["gcloud", "--version"], capture_output=True, text=True, timeout=10
+        )
+        return result.stdout.splitlines()[0] if result.stdout else "unknown"
+    except Exception:
+        return "unknown"
+
+
+# Bootstrap for a long-lived child process that imports the Cloud SDK once
+# and then executes command lookups in-process, amortizing gcloud's
+# interpreter startup (~150-300ms per invocation) across all help probes.
+# Protocol: one JSON request line in ({"argv": [...]}), one JSON response
+# line out ({"rc": ..., "output": ...}).
+_GCLOUD_SERVER_BOOTSTRAP = r'''
+import contextlib, io, json, sys
+sys.path.insert(0, sys.argv[1])
+from googlecloudsdk.gcloud_main import CreateCLI
+cli = CreateCLI([])
+for line in sys.stdin:
+    request = json.loads(line)
+    out = io.StringIO()
+    rc = 0
+    try:
+        with contextlib.redirect_stdout(out), contextlib.redirect_stderr(out):
+            cli.Execute(request["argv"])
+    except SystemExit as e:
+        rc = int(e.code or 0)
+    except Exception as e:
+        rc = 1
+        out.write(str(e))
+    sys.stdout.write(json.dumps({"rc": rc, "output": out.getvalue()}) + "\n")
+    sys.stdout.flush()
+'''
+
+
+@functools.lru_cache(maxsize=1)
+def _gcloud_sdk_lib_dir() -> Optional[str]:
+    """Locate the Cloud SDK's lib directory so the worker can import it."""
+    try:
+        result = subprocess.run(
+            ["gcloud", "info", "--format=value(installation.sdk_root)"],
+            capture_output=True,
+            text=True,
+            timeout=10,
+        )
+    except Exception:
+        return None
+    root = result.stdout.strip()
+    if result.returncode != 0 or not root:
+        return None
+    lib_dir = os.path.join(root, "lib")
+    return lib_dir if os.path.isdir(lib_dir) else None
+
+
+class _GcloudHelpServer:
+    """
+    Long-lived gcloud worker that serves command lookups over a pipe,
+    avoiding a fresh fork/exec + Python startup per gcloud call. Falls
+    back to None (caller runs a one-shot subprocess) when the SDK can't
+    be imported or the worker dies.
+    """
+
+    def __init__(self):
+        self._proc: Optional[subprocess.Popen] = None
+        self._lock = threading.Lock()
+
+    def _ensure_proc(self) -> bool:
+        if self._proc is not None and self._proc.poll() is None:
+            return True
+        lib_dir = _gcloud_sdk_lib_dir()
+        if not lib_dir:
+            return False
+        try:
+            self._proc = subprocess.Popen(
+                [sys.executable, "-c", _GCLOUD_SERVER_BOOTSTRAP, lib_dir],
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.DEVNULL,
+                text=True,
+            )
+        except Exception:
+            self._proc = None
+            return False
+        return True
+
+    def get_help(self, partial_command: str) -> Optional[Tuple[bool, str]]:
+        """
+        Fetch help text for 'gcloud <partial_command>' via the worker.
+
+        Args:
+            partial_command: The gcloud command (without 'gcloud' prefix)
+
+        Returns:
+            Tuple of (success, help_text), or None if the worker is unavailable
+        """
+        with self._lock:
+            if not self._ensure_proc():
+                return None
+            try:
+                request = json.dumps({"argv": partial_command.split() + ["--help"]})
+                self._proc.stdin.write(request + "\n")
+                self._proc.stdin.flush()
+                line = self._proc.stdout.readline()
+                if not line:
+                    raise RuntimeError("gcloud worker closed its pipe")
+                response = json.loads(line)
+                return response["rc"] == 0, response["output"]
+            except Exception:
+                self._proc.kill()
+                self._proc = None
+                return None
+
+
+_help_server = _GcloudHelpServer()
+
+
+class _HelpLookupError(Exception):
+    """Raised when gcloud itself could not be run for a help lookup."""
+
+
+@functools.lru_cache(maxsize=4096)
+def _gcloud_help_cached(partial_command: str) -> Tuple[bool, str]:
+    """
+    Fetch help text for 'gcloud <partial_command>', consulting the in-process
+    lru_cache first, then the on-disk cache, then the actual gcloud binary.
+
+    Raises:
+        _HelpLookupError: On transient failures (timeout, missing binary).
+            Raising keeps them out of the lru_cache so later attempts
+            re-run gcloud instead of replaying a stale error.
+    """
+    version = _gcloud_sdk_version()
+    with _help_db_lock:
+        row = _help_cache_db().execute(
+            "SELECT rc, stdout, stderr FROM help_cache WHERE version = ? AND command = ?",
+            (version, partial_command),
+        ).fetchone()
+    if row is not None:
+        return row[0] == 0, row[1] + row[2]
+
+    # Prefer the persistent worker (no per-call gcloud startup); fall back
+    # to a one-shot subprocess when the worker is unavailable
+    served = _help_server.get_help(partial_command)
+    if served is not None:
+        success, output = served
+        rc, stdout, stderr = (0 if success else 1), output, ""
+    else:
+        try:
+            # Capture bytes and decode once; avoids text-mode's locale and
+            # newline handling on large help dumps
+            result = subprocess.run(
+                ["gcloud", *partial_command.split(), "--help"],
+                capture_output=True,
+                timeout=10,
+            )
+        except Exception as e:
+            # Transient failures (timeouts, missing binary) are not cached
+            raise _HelpLookupError(str(e)) from e
+        rc = result.returncode
+        stdout = result.stdout.decode("utf-8", "replace")
+        stderr = result.stderr.decode("utf-8", "replace")
+    with _help_db_lock:
+        db = _help_cache_db()
+        db.execute(
+            "INSERT OR REPLACE INTO help_cache VALUES (?, ?, ?, ?, ?)",
+            (version, partial_command, rc, stdout, stderr),
+        )
+        db.commit()
+    return rc == 0, stdout + stderr
+
+
+# Static rules sent as the model's system instruction. Keeping this prefix
+# byte-identical across calls means it's uploaded once per model and lets
+# Gemini's prompt cache reuse it, so retries only pay for the dynamic part.
+_SYSTEM_PROMPT = """You are an expert in Google Cloud Platform and gcloud CLI commands.
+
+You generate syntactically correct gcloud commands from user requests.
+
+CRITICAL RULES:
+1. Output ONLY the gcloud command, nothing else
+2. Use placeholders for actual values:
+   - PROJECT_ID for project IDs
+   - SERVICE_NAME for service names
+   - REGION for regions (or use 'us-central1' as default)
+   - INSTANCE_NAME for instance names
+   - etc.
+3. Ensure the command uses correct gcloud syntax
+4. Use the most common and stable command structure
+5. Include essential flags only
+6. Do NOT add explanations, markdown, or code blocks
+
+Example format:
+gcloud run services describe SERVICE_NAME --project=PROJECT_ID --region=REGION
+"""
+
+_TRIE_CACHE_FILE = os.path.join(_CACHE_DIR, "trie.pkl")
+_TRIE_LEAF = "$"
+
+
+def _discover_command_paths() -> List[str]:
+    """
+    List every gcloud command path via 'gcloud meta list-commands'.
+
+    Returns:
+        List of space-separated command paths (without the 'gcloud' prefix),
+        or an empty list if discovery fails.
+    """
+    try:
+        result = subprocess.run(
+            ["gcloud", "meta", "list-commands"],
+            capture_output=True,
+            text=True,
+            timeout=60,
+        )
+    except Exception:
+        return []
+    if result.returncode != 0:
+        return []
+    paths = []
+    for line in result.stdout.splitlines():
+        line = line.strip()
+        if line.startswith("gcloud "):
+            paths.append(line[7:])
+    return paths
+
+
+def _build_command_trie(paths: List[str]) -> Dict:
+    """
+    Build a nested-dict trie from command paths for in-memory prefix lookup.
+
+    Args:
+        paths: Space-separated command paths (e.g. 'run services describe')
+
+    Returns:
+        Nested dict mapping token -> subtree, with leaves marked by '$'
+    """
+    trie: Dict = {}
+    for path in paths:
+        node = trie
+        for token in path.split():
+            node = node.setdefault(token, {})
+        node[_TRIE_LEAF] = True
+    return trie
+
+
+def _load_command_trie() -> Optional[Dict]:
+    """
+    Load the command trie from the pickle cache, rebuilding it when the
+    SDK version changed or no cache exists yet.
+
+    Returns:
+        The trie, or None if command discovery is unavailable
+    """
+    version = _gcloud_sdk_version()
+    try:
+        with open(_TRIE_CACHE_FILE, "rb") as f:
+            cached_version, trie = pickle.load(f)
+        if cached_version == version:
+            return trie
+    except Exception:
+        pass
+    paths = _discover_command_paths()
+    if not paths:
+        return None
+    trie = _build_command_trie(paths)
+    try:
+        os.makedirs(_CACHE_DIR, exist_ok=True)
+        with open(_TRIE_CACHE_FILE, "wb") as f:
+            pickle.dump((version, trie), f)
+    except OSError:
+        pass
+    return trie
+
+
 class GCloudCommandGenerator:
     def __init__(self, gemini_api_key: str, max_iterations: int = 3):
         """
@@ -23,8 +377,20 @@ class GCloudCommandGenerator:
             max_iterations: Maximum number of validation attempts
         """
         genai.configure(api_key=gemini_api_key)
-        self.model = genai.GenerativeModel('gemini-2.5-pro-latest')
+        # One model instance for all requests: the static rules ride along as
+        # the system instruction and the session stays hot across retries
+        self.model = genai.GenerativeModel(
+            'gemini-2.5-pro-latest',
+            system_instruction=_SYSTEM_PROMPT,
+            generation_config=genai.types.GenerationConfig(
+                candidate_count=1,
+                max_output_tokens=256,
+            ),
+        )
         self.max_iterations = max_iterations
+        # In-memory trie of valid command paths; lets validation find the
+        # command without probing gcloud once per prefix
+        self._command_trie = _load_command_trie()
         
     def _get_gcloud_help(self, partial_command: str) -> Tuple[bool, str]:
         """
@@ -37,15 +403,8 @@ class GCloudCommandGenerator:
             Tuple of (success, help_text)
         """
         try:
-            cmd = f"gcloud {partial_command} --help"
-            result = subprocess.run(
-                cmd.split(),
-                capture_output=True,
-                text=True,
-                timeout=10
-            )
-            return result.returncode == 0, result.stdout + result.stderr
-        except Exception as e:
+            return _gcloud_help_cached(partial_command)
+        except _HelpLookupError as e:
             return False, str(e)
     
     def _validate_command_syntax(self, command: str) -> Tuple[bool, str]:
@@ -66,24 +425,59 @@ class GCloudCommandGenerator:
         parts = command.split()
         if len(parts) == 0:
             return False, "Empty command"
-        
-        # Try to get help for the specific command
-        # We'll check progressively: service, service + subcommand, etc.
-        for i in range(1, len(parts) + 1):
-            # Skip flags/options
-            check_parts = [p for p in parts[:i] if not p.startswith('-')]
-            if not check_parts:
-                continue
-                
-            partial_cmd = ' '.join(check_parts)
-            success, help_text = self._get_gcloud_help(partial_cmd)
-            
+
+        # Fast path: walk the precomputed trie to find the command path
+        # in memory, then fetch help only for the matched leaf
+        if self._command_trie is not None:
+            matched_path = self._match_command_path(parts)
+            if matched_path is None:
+                return False, f"Invalid gcloud command structure: {command}"
+            success, help_text = self._get_gcloud_help(matched_path)
+            if not success:
+                return False, f"Could not get help for: {matched_path}"
+            return self._validate_full_command(command, help_text)
+
+        # Fallback when command discovery is unavailable: probe gcloud help
+        # progressively for service, service + subcommand, etc. Stop at the
+        # first flag - nothing past it can be a subcommand
+        check_parts: List[str] = []
+        for part in parts:
+            if part.startswith('-'):
+                break
+            check_parts.append(part)
+            success, help_text = self._get_gcloud_help(' '.join(check_parts))
+
             if success:
                 # Command path exists, now validate the full command structure
                 return self._validate_full_command(command, help_text)
-        
+
         return False, f"Invalid gcloud command structure: {command}"
-    
+
+    def _match_command_path(self, parts: List[str]) -> Optional[str]:
+        """
+        Walk the command trie to find the deepest valid command path.
+
+        Args:
+            parts: Tokenized command (without the 'gcloud' prefix)
+
+        Returns:
+            Space-separated command path, or None if no valid path matches
+        """
+        node = self._command_trie
+        matched: List[str] = []
+        deepest_leaf = None
+        for token in parts:
+            if token.startswith('-'):
+                # Flags can't be subcommands; nothing deeper can match
+                break
+            if token not in node:
+                break
+            node = node[token]
+            matched.append(token)
+            if _TRIE_LEAF in node:
+                deepest_leaf = ' '.join(matched)
+        return deepest_leaf
+
     def _validate_full_command(self, command: str, help_text: str) -> Tuple[bool, str]:
         """
         Validate the full command against its help text.
@@ -96,16 +490,16 @@ class GCloudCommandGenerator:
             Tuple of (is_valid, error_message)
         """
         # Extract flags from command
-        flags = re.findall(r'--[\w-]+', command)
-        
-        # Check if flags are valid according to help text
-        invalid_flags = []
-        for flag in flags:
-            # Remove trailing '=' if present
-            flag_name = flag.split('=')[0]
-            if flag_name not in help_text:
-                invalid_flags.append(flag_name)
-        
+        flags = _FLAG_RE.findall(command)
+
+        # Check flags against the set parsed once from the help text;
+        # O(1) membership instead of a substring scan per flag
+        known_flags = _parse_help_flags(help_text)
+        invalid_flags = [
+            flag.split('=')[0] for flag in flags
+            if flag.split('=')[0] not in known_flags
+        ]
+
         if invalid_flags:
             return False, f"Invalid flags: {', '.join(invalid_flags)}"
         
@@ -118,33 +512,15 @@ class GCloudCommandGenerator:
         Args:
             user_prompt: User's description of what they want to do
             previous_error: Error from previous generation attempt
-            
+
         Returns:
-            Formatted prompt for Gemini
+            Formatted prompt for Gemini (the static rules live in the
+            model's system instruction; only the dynamic part is built here)
         """
-        base_prompt = f"""You are an expert in Google Cloud Platform and gcloud CLI commands.
-
-Generate a syntactically correct gcloud command based on this request:
+        base_prompt = f"""Generate a syntactically correct gcloud command based on this request:
 {user_prompt}
-
-CRITICAL RULES:
-1. Output ONLY the gcloud command, nothing else
-2. Use placeholders for actual values:
-   - PROJECT_ID for project IDs
-   - SERVICE_NAME for service names
-   - REGION for regions (or use 'us-central1' as default)
-   - INSTANCE_NAME for instance names
-   - etc.
-3. Ensure the command uses correct gcloud syntax
-4. Use the most common and stable command structure
-5. Include essential flags only
-6. Do NOT add explanations, markdown, or code blocks
-
-Example format:
-gcloud run services describe SERVICE_NAME --project=PROJECT_ID --region=REGION
-
 """
-        
+
         if previous_error:
             base_prompt += f"""
 PREVIOUS ATTEMPT FAILED with error:
@@ -166,32 +542,32 @@ Please correct the command and try again.
         Returns:
             Dictionary with 'success', 'command', and 'message' keys
         """
+        if verbose:
+            _enable_verbose_logging()
+
         previous_error = None
-        
+
         for iteration in range(self.max_iterations):
-            if verbose:
-                print(f"\n--- Iteration {iteration + 1} ---")
-            
+            _log.debug("--- Iteration %d ---", iteration + 1)
+
             # Generate command using Gemini
             prompt = self._create_generation_prompt(user_prompt, previous_error)
-            
+
             try:
                 response = self.model.generate_content(prompt)
                 generated_command = response.text.strip()
-                
+
                 # Clean up the response (remove markdown, extra text)
                 generated_command = self._clean_command(generated_command)
-                
-                if verbose:
-                    print(f"Generated: {generated_command}")
-                
+
+                _log.debug("Generated: %s", generated_command)
+
                 # Validate the command
                 is_valid, message = self._validate_command_syntax(generated_command)
-                
-                if verbose:
-                    print(f"Validation: {'✓ VALID' if is_valid else '✗ INVALID'}")
-                    print(f"Message: {message}")
-                
+
+                _log.debug("Validation: %s", '✓ VALID' if is_valid else '✗ INVALID')
+                _log.debug("Message: %s", message)
+
                 if is_valid:
                     return {
                         'success': True,
@@ -201,10 +577,9 @@ Please correct the command and try again.
                     }
                 else:
                     previous_error = message
-                    
+
             except Exception as e:
-                if verbose:
-                    print(f"Error during generation: {str(e)}")
+                _log.debug("Error during generation: %s", e)
                 previous_error = str(e)
         
         return {
@@ -213,7 +588,54 @@ Please correct the command and try again.
             'message': f'Failed to generate valid command after {self.max_iterations} attempts',
             'last_error': previous_error
         }
-    
+
+    async def generate_command_async(self, user_prompt: str) -> Dict:
+        """
+        Async variant of generate_command for processing prompts concurrently.
+
+        Gemini calls use the async client and gcloud validation runs in a
+        worker thread, so neither blocks the event loop; independent prompts
+        overlap their LLM round-trips instead of running back to back.
+
+        Args:
+            user_prompt: User's description of what they want to do
+
+        Returns:
+            Dictionary with 'success', 'command', and 'message' keys
+        """
+        previous_error = None
+
+        for iteration in range(self.max_iterations):
+            prompt = self._create_generation_prompt(user_prompt, previous_error)
+
+            try:
+                response = await self.model.generate_content_async(prompt)
+                generated_command = self._clean_command(response.text.strip())
+
+                # Validation shells out to gcloud; run it off the loop
+                is_valid, message = await asyncio.to_thread(
+                    self._validate_command_syntax, generated_command
+                )
+
+                if is_valid:
+                    return {
+                        'success': True,
+                        'command': generated_command,
+                        'message': 'Command generated and validated successfully',
+                        'iterations': iteration + 1
+                    }
+                previous_error = message
+
+            except Exception as e:
+                previous_error = str(e)
+
+        return {
+            'success': False,
+            'command': None,
+            'message': f'Failed to generate valid command after {self.max_iterations} attempts',
+            'last_error': previous_error
+        }
+
     def _clean_command(self, command: str) -> str:
         """
         Clean the generated command from markdown and extra text.
@@ -225,11 +647,11 @@ Please correct the command and try again.
             Cleaned command string
         """
         # Remove markdown code blocks
-        command = re.sub(r'```(?:bash|shell)?\n?', '', command)
-        command = re.sub(r'```', '', command)
-        
+        command = _MD_FENCE_RE.sub('', command)
+        command = _TRIPLE_BACKTICK_RE.sub('', command)
+
         # Remove common prefixes
-        command = re.sub(r'^[$#]\s*', '', command)
+        command = _SHELL_PREFIX_RE.sub('', command)
         
         # Get first line if multiline
         lines = [line.strip() for line in command.split('\n') if line.strip()]
@@ -268,13 +690,20 @@ def main():
     print("=" * 70)
     print("GCloud Command Generator - Test Cases")
     print("=" * 70)
-    
-    for prompt in test_prompts:
+
+    # Run all prompts concurrently; total wall clock is the slowest prompt
+    # rather than the sum of all of them
+    async def run_all():
+        return await asyncio.gather(
+            *(generator.generate_command_async(p) for p in test_prompts)
+        )
+
+    results = asyncio.run(run_all())
+
+    for prompt, result in zip(test_prompts, results):
         print(f"\n📝 Prompt: {prompt}")
         print("-" * 70)
-        
-        result = generator.generate_command(prompt, verbose=True)
-        
+
         if result['success']:
             print(f"\n✅ SUCCESS!")
             print(f"Command: {result['command']}")
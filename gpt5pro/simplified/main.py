@@ -1,6 +1,8 @@
 #!/usr/bin/env python3
 # Simple, deterministic gcloud command generator.
 # Usage: python gcloud_cmd_gen.py "show config for my cloud run service"
+import functools
+import re
 import sys
 
 # --- Canonical templates (from official gcloud docs) ---
@@ -102,10 +104,110 @@ ACTION_PREFERENCE = [
     "describe", "list", "policy"
 ]
 
+# Actions that actually have a template, per service (derived from TEMPLATES).
+# Action hints outside this set can only dead-end, so resolution skips them
+# (e.g. "tail" on a GKE prompt falls through to describe instead of
+# resolving to an action with no template).
+SERVICE_ACTIONS = {}
+for (_svc, _act) in TEMPLATES:
+    SERVICE_ACTIONS.setdefault(_svc, set()).add(_act)
+
+# Each action gets one bit, assigned in preference order, so matched actions
+# accumulate into an int and the most-preferred hit is the lowest set bit —
+# one (hits & -hits) isolates it, no walk over ACTION_PREFERENCE needed.
+ACTION_BIT = {_a: 1 << _i for _i, _a in enumerate(ACTION_PREFERENCE)}
+_ACTION_BY_BIT = tuple(ACTION_PREFERENCE)
+# Per-service mask of actions that actually have a template.
+_ALLOWED_MASK = {
+    _svc: sum(ACTION_BIT[_a] for _a in _acts)
+    for _svc, _acts in SERVICE_ACTIONS.items()
+}
+
+# --- Hint matcher (built once at import) ---
+def _minimal(hints):
+    # Drop hints subsumed by a shorter hint in the same bucket ("cloud
+    # storage" can only match where "storage" already matched, so scanning
+    # for it is dead work). Same owner, same hits, fewer alternatives.
+    return tuple(
+        h for h in hints
+        if not any(h2 != h and h2 in h for h2 in hints)
+    )
+
+# Scanning the prompt once for all hints beats re-scanning it per hint. The
+# hint dicts are flattened into parallel arrays (one entry per (hint, owner)
+# pair, insertion order preserved) so every matcher table below is derived
+# from a single flat structure instead of nested dict/tuple walks.
+_HINT_STRS = []
+_HINT_KIND = []  # "svc" or "act", parallel to _HINT_STRS
+_HINT_KEY = []   # owning service/action name, parallel to _HINT_STRS
+for _svc, _hints in SERVICE_HINTS.items():
+    for _h in _minimal(_hints):
+        _HINT_STRS.append(_h)
+        _HINT_KIND.append("svc")
+        _HINT_KEY.append(_svc)
+for _act, _hints in ACTION_HINTS.items():
+    for _h in _minimal(_hints):
+        _HINT_STRS.append(_h)
+        _HINT_KIND.append("act")
+        _HINT_KEY.append(_act)
+_HINT_STRS = tuple(_HINT_STRS)
+_HINT_KIND = tuple(_HINT_KIND)
+_HINT_KEY = tuple(_HINT_KEY)
+
+# Some hints (e.g. "policy") belong to both a service and an action; fold
+# the parallel arrays into per-hint owner sets so firing a hint is two set
+# unions rather than a loop over (kind, key) pairs.
+_OWNER_SVCS = {}
+_OWNER_ACTS = {}
+for _i, _h in enumerate(_HINT_STRS):
+    _bucket = _OWNER_SVCS if _HINT_KIND[_i] == "svc" else _OWNER_ACTS
+    _bucket.setdefault(_h, set()).add(_HINT_KEY[_i])
+
+# One compiled alternation scanned in C; no third-party matcher needed. The
+# lookahead makes matches zero-width so overlapping hints all fire;
+# alternatives are sorted longest-first (longest-match-per-position, like a
+# trie walk), and since a longer hint shadows any hint that is its prefix at
+# the same position, each hint also credits its hint-prefixes' owners (e.g.
+# "iam policy" also counts as the "iam" service hint).
+_HINT_RE = re.compile(
+    "(?=(%s))" % "|".join(re.escape(h) for h in sorted(set(_HINT_STRS), key=len, reverse=True))
+)
+_MATCH_OWNERS = {}
+for _h in set(_HINT_STRS):
+    _svcs = set(_OWNER_SVCS.get(_h, ()))
+    _acts = set(_OWNER_ACTS.get(_h, ()))
+    for _h2 in set(_HINT_STRS):
+        if _h2 != _h and _h.startswith(_h2):
+            _svcs |= _OWNER_SVCS.get(_h2, set())
+            _acts |= _OWNER_ACTS.get(_h2, set())
+    _MATCH_OWNERS[_h] = (frozenset(_svcs), sum(ACTION_BIT[_a] for _a in _acts))
+
+# Cheap screen: a prompt containing none of the service hints' first
+# characters can't possibly name a product, so service resolution can bail
+# before any scanning. One character-class search in C.
+_PRESCREEN = re.compile(
+    "[%s]" % "".join(sorted({h[0] for hs in SERVICE_HINTS.values() for h in hs}))
+)
+
+def _scan_hints(t):
+    # Returns (service hits, action-bit mask) for the lowercased prompt.
+    # Always the full scan: hints are matched as substrings, not tokens
+    # ("vm" must hit inside "vms", "cloud-run" spans punctuation), so any
+    # token-level shortcut misses hits and can flip the winning service.
+    services, actions = set(), 0
+    for m in _HINT_RE.finditer(t):
+        svcs, acts = _MATCH_OWNERS[m.group(1)]
+        services |= svcs
+        actions |= acts
+    return services, actions
+
 def pick_service(text: str):
     t = text.lower()
-    for svc, hints in SERVICE_HINTS.items():
-        if any(h in t for h in hints):
+    if not _PRESCREEN.search(t):
+        return None
+    services, _ = _scan_hints(t)
+    for svc in SERVICE_HINTS:
+        if svc in services:
             return svc
     return None
 
@@ -113,32 +215,76 @@ def pick_action(service: str, text: str):
     # IAM defaults to policy if hinted.
     if service == "iam":
         return "policy"
-    t = text.lower()
-    matches = [k for k, hints in ACTION_HINTS.items() if any(h in t for h in hints)]
-    if not matches:
-        # default read-only action is describe for most services
-        return "describe"
-    # resolve conflicts with a stable preference order
-    for pref in ACTION_PREFERENCE:
-        if pref in matches:
-            return pref
-    return matches[0]
+    _, matches = _scan_hints(text.lower())
+    # conflicts resolve by preference order, limited to actions this service
+    # has a template for: masking keeps the templated hits and the lowest
+    # set bit is the most-preferred one; default read-only action is describe
+    hits = matches & _ALLOWED_MASK.get(service, 0)
+    if hits:
+        return _ACTION_BY_BIT[(hits & -hits).bit_length() - 1]
+    return "describe"
 
-def generate(prompt: str) -> str:
-    service = pick_service(prompt)
+_UNSUPPORTED = "Unsupported/ambiguous prompt. Try mentioning a product (e.g., 'Cloud Run', 'GKE', 'Compute Engine', 'Cloud SQL', 'Cloud Storage', or 'IAM')."
+
+def _resolve(services, actions):
+    # Turn scan results (service hits, action-bit mask) into a command.
+    service = next((s for s in SERVICE_HINTS if s in services), None)
     if not service:
-        return "Unsupported/ambiguous prompt. Try mentioning a product (e.g., 'Cloud Run', 'GKE', 'Compute Engine', 'Cloud SQL', 'Cloud Storage', or 'IAM')."
-    action = pick_action(service, prompt)
-    key = (service, action)
-    if key not in TEMPLATES:
+        return _UNSUPPORTED
+    if service == "iam":
+        action = "policy"
+    else:
+        hits = actions & _ALLOWED_MASK.get(service, 0)
+        action = _ACTION_BY_BIT[(hits & -hits).bit_length() - 1] if hits else "describe"
+    template = TEMPLATES.get((service, action))
+    if template is None:
         return f"No safe template for: {service} + {action}. Add one to TEMPLATES."
-    return TEMPLATES[key]
+    return template
+
+# generate is a pure function of the prompt, so repeat prompts (common when
+# wrapped by a shell alias or server) become a single cache lookup.
+@functools.lru_cache(maxsize=1024)
+def generate(prompt: str) -> str:
+    # Lowercase once; one scan resolves both the service and the action.
+    # pick_service and pick_action stay as entry points but the hot path
+    # doesn't re-scan.
+    lowered = prompt.lower()
+    if not _PRESCREEN.search(lowered):
+        return _UNSUPPORTED
+    return _resolve(*_scan_hints(lowered))
+
+def generate_many(prompts):
+    # Batch mode for callers (e.g. a server) holding many prompts: the
+    # lowercased prompts are joined into one buffer with a sentinel absent
+    # from every hint, the alternation scans the buffer once, and matches
+    # are bucketed per prompt by position. No hint contains the sentinel,
+    # so no match can straddle a prompt boundary.
+    lowered = [p.lower() for p in prompts]
+    buf = "\x01".join(lowered)
+    services = [set() for _ in lowered]
+    actions = [0] * len(lowered)
+    ends = []
+    pos = 0
+    for p in lowered:
+        pos += len(p)
+        ends.append(pos)
+        pos += 1  # sentinel
+    i = 0
+    for m in _HINT_RE.finditer(buf):
+        start = m.start()
+        while start >= ends[i]:
+            i += 1
+        svcs, acts = _MATCH_OWNERS[m.group(1)]
+        services[i] |= svcs
+        actions[i] |= acts
+    return [_resolve(s, a) for s, a in zip(services, actions)]
 
 def main():
     if len(sys.argv) < 2:
         print("Usage: python gcloud_cmd_gen.py \"your prompt here\"")
         sys.exit(1)
-    prompt = sys.argv[1]
+    # Interned prompts hit the cache's identity fast path
+    prompt = sys.intern(sys.argv[1])
     print(generate(prompt))
 
 if __name__ == "__main__":
@@ -13,17 +13,30 @@ from __future__ import annotations
 
 import argparse
 import collections
+import concurrent.futures
 import dataclasses
+import functools
 import json
 import os
 import pathlib
 import re
 import shlex
+import sqlite3
 import subprocess
 import sys
 import textwrap
-from difflib import SequenceMatcher
-from typing import Dict, List, Optional, Tuple
+import threading
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+
+try:
+    import orjson  # C-speed JSON; optional
+except ImportError:
+    orjson = None
+
+try:
+    from rapidfuzz import fuzz as _rf_fuzz  # C/SIMD string similarity; optional
+except ImportError:
+    _rf_fuzz = None
 
 # -----------------------------
 # Paths & cache
@@ -31,20 +44,35 @@ from typing import Dict, List, Optional, Tuple
 
 CACHE_DIR = pathlib.Path(os.environ.get("XDG_CACHE_HOME", pathlib.Path.home() / ".cache")) / "gcloud_cmdgen"
 CACHE_DIR.mkdir(parents=True, exist_ok=True)
-INDEX_FILE = CACHE_DIR / "gcloud_index.json"
+INDEX_FILE = CACHE_DIR / "gcloud_index.json"  # legacy format, migrated on first load
+INDEX_DB_FILE = CACHE_DIR / "gcloud_index.sqlite"
 META_FILE = CACHE_DIR / "meta.json"
+HELP_CACHE_FILE = CACHE_DIR / "help_cache.db"
+
+# How many `gcloud ... --help` subprocesses to keep in flight at once.
+# The work is I/O-bound (fork/exec + gcloud's own Python startup), so a thread
+# pool overlaps the waits; too many workers just thrash gcloud startups.
+MAX_HELP_WORKERS = int(os.environ.get("GCLOUD_CMDGEN_WORKERS", "32"))
 
 # -----------------------------
 # Helpers
 # -----------------------------
 
 def run(cmd: List[str], timeout: int = 45) -> Tuple[int, str, str]:
-    """Run a subprocess and capture output."""
+    """
+    Run a subprocess and capture output. Output is captured as raw bytes and
+    decoded as UTF-8 in one shot, skipping text-mode's locale lookup and
+    universal-newline translation on multi-KB help dumps.
+    """
     try:
         p = subprocess.run(
-            cmd, capture_output=True, text=True, timeout=timeout, check=False
+            cmd, capture_output=True, timeout=timeout, check=False
+        )
+        return (
+            p.returncode,
+            p.stdout.decode("utf-8", "replace"),
+            p.stderr.decode("utf-8", "replace"),
         )
-        return p.returncode, p.stdout, p.stderr
     except Exception as e:
         return 1, "", f"{type(e).__name__}: {e}"
 
@@ -56,9 +84,65 @@ def gcloud_info_sdk_root() -> Optional[str]:
         return root or None
     return None
 
+# -----------------------------
+# Help cache
+# -----------------------------
+# `gcloud ... --help` output is static for a given SDK version, so results are
+# cached on disk keyed by (sdk_version, command path). Upgrading the SDK
+# changes the version key and naturally invalidates old entries.
+
+_help_db: Optional[sqlite3.Connection] = None
+_help_db_lock = threading.Lock()
+_sdk_version: Optional[str] = None
+
+def gcloud_sdk_version() -> str:
+    """Return the installed SDK version string (cached per process)."""
+    global _sdk_version
+    if _sdk_version is None:
+        rc, out, _ = run(["gcloud", "--version"])
+        _sdk_version = out.splitlines()[0] if rc == 0 and out else "unknown"
+    return _sdk_version
+
+def _help_db_conn() -> sqlite3.Connection:
+    global _help_db
+    if _help_db is None:
+        _help_db = sqlite3.connect(HELP_CACHE_FILE, check_same_thread=False)
+        _help_db.execute(
+            "CREATE TABLE IF NOT EXISTS help_cache ("
+            "version TEXT, command TEXT, rc INTEGER, stdout TEXT, stderr TEXT, "
+            "PRIMARY KEY (version, command))"
+        )
+    return _help_db
+
+def run_help(path_tokens: List[str], timeout: int = 60) -> Tuple[int, str, str]:
+    """Like run(['gcloud', *path_tokens, '--help']) but backed by the on-disk cache."""
+    key = " ".join(path_tokens)
+    version = gcloud_sdk_version()
+    with _help_db_lock:
+        row = _help_db_conn().execute(
+            "SELECT rc, stdout, stderr FROM help_cache WHERE version = ? AND command = ?",
+            (version, key),
+        ).fetchone()
+    if row is not None:
+        return row[0], row[1], row[2]
+    rc, out, err = run(["gcloud", *path_tokens, "--help"], timeout=timeout)
+    # Don't cache empty failures (timeouts, missing binary); they may be transient.
+    if rc == 0 or out:
+        with _help_db_lock:
+            conn = _help_db_conn()
+            conn.execute(
+                "INSERT OR REPLACE INTO help_cache VALUES (?, ?, ?, ?, ?)",
+                (version, key, rc, out, err),
+            )
+            conn.commit()
+    return rc, out, err
+
 # Conservative set of GCLOUD WIDE FLAGS that we can safely add for placeholders.
-# (They are accepted by all commands; users may trim them.)
-GCLOUD_WIDE_FLAGS = {"--project", "--quiet", "--format", "--verbosity", "--account", "--configuration"}
+# (They are accepted by all commands; users may trim them.) Stored once and
+# referenced from every spec rather than copied into each flag list.
+GCLOUD_WIDE_FLAGS = frozenset(
+    {"--project", "--quiet", "--format", "--verbosity", "--account", "--configuration"}
+)
 
 # Normalization maps
 VERB_SYNONYMS = {
@@ -136,46 +220,172 @@ RESOURCE_SYNONYMS = {
     "builds": "builds",
 }
 
-TOKEN_SPLIT_RE = re.compile(r"[^\w\-]+")
+# Merged at import so tokenization does one dict.get per token instead of
+# probing the verb and resource tables separately
+_SYNONYMS = {**VERB_SYNONYMS, **RESOURCE_SYNONYMS}
 
-def tokenize(text: str) -> List[str]:
-    return [t.lower() for t in TOKEN_SPLIT_RE.split(text) if t]
+TOKEN_RE = re.compile(r"[\w\-]+")
 
-def canonicalize_tokens(tokens: List[str]) -> List[str]:
-    out: List[str] = []
-    for t in tokens:
-        if t in VERB_SYNONYMS:
-            out.append(VERB_SYNONYMS[t])
-        elif t in RESOURCE_SYNONYMS:
-            out.append(RESOURCE_SYNONYMS[t])
-        else:
-            out.append(t)
-    return out
+# Help-text parsing patterns, compiled once at import
+_FLAG_LINE_RE = re.compile(r"(--[a-z0-9][a-z0-9\-]*)\b")
+_UPPER_TOK_RE = re.compile(r"\b[A-Z][A-Z0-9_\-]*\b")
+_GROUP_LINE_RE = re.compile(r"\s+([a-z0-9\-]+)\s+.*")
+
+def scan_help_sections(out: str) -> Tuple[str, str, List[str]]:
+    """
+    One forward pass over help text with a tiny section state machine.
+    Returns (first description line, USAGE block, flags from FLAGS section).
+    Avoids the backtracking '[\\s\\S]+?' block regexes and their full-text copies.
+    """
+    help_one_line = ""
+    usage_lines: List[str] = []
+    flags: List[str] = []
+    section = None
+    for raw in out.splitlines():
+        stripped = raw.strip()
+        if raw and not raw[0].isspace():
+            # Unindented lines are section headers (NAME, USAGE, FLAGS, ...)
+            section = stripped.split()[0] if stripped else None
+        elif section == "USAGE":
+            usage_lines.append(raw)
+        elif section == "FLAGS":
+            m = _FLAG_LINE_RE.match(stripped)
+            if m:
+                flags.append(m.group(1))
+        if not help_one_line and stripped and not stripped.startswith(
+            ("NAME", "SYNOPSIS", "USAGE")
+        ):
+            help_one_line = stripped
+    return help_one_line, "\n".join(usage_lines), flags
 
-def ratio(a: str, b: str) -> float:
-    return SequenceMatcher(a=a, b=b).ratio()
+def tokenize_canon(text: str) -> List[str]:
+    """Lowercase, tokenize, and canonicalize synonyms in a single pass."""
+    get = _SYNONYMS.get
+    return [get(t, t) for t in TOKEN_RE.findall(text.lower())]
 
 # -----------------------------
 # Data structures
 # -----------------------------
 
-@dataclasses.dataclass
+@dataclasses.dataclass(frozen=True)
 class CommandSpec:
-    path: str                     # e.g. "run services describe"
-    release: str                  # "ga", "beta", or "alpha"
-    flags: List[str]              # ["--region", "--project", ...]
-    positionals: List[str]        # ["SERVICE", "INSTANCE", ...] (placeholders)
+    path: str                         # e.g. "run services describe"
+    release: str                      # "ga", "beta", or "alpha"
+    flags: Tuple[str, ...]            # command-specific flags only (wide flags excluded)
+    positionals: Tuple[str, ...]      # ("SERVICE", "INSTANCE", ...) (placeholders)
     help_one_line: str = ""
+    rendered: str = ""                # command string pre-rendered at index build time
+
+    def supports_flag(self, flag: str) -> bool:
+        """True if this command accepts the flag (including gcloud-wide flags)."""
+        return flag in self.flags or flag in GCLOUD_WIDE_FLAGS
+
+    def to_json_dict(self) -> Dict:
+        """Field dict for serialization; no recursive copying like dataclasses.asdict."""
+        return {
+            "path": self.path,
+            "release": self.release,
+            "flags": self.flags,
+            "positionals": self.positionals,
+            "help_one_line": self.help_one_line,
+            "rendered": self.rendered,
+        }
+
+
+def _intern_spec_fields(path: str, release: str, flags, positionals, help_one_line: str = "", rendered: str = "") -> CommandSpec:
+    """
+    Build a CommandSpec with interned, deduplicated strings. The same ~30 flag
+    and placeholder names repeat across thousands of specs; interning shares
+    one object per distinct string and makes set/mask comparisons identity-fast.
+    """
+    return CommandSpec(
+        path=sys.intern(path),
+        release=sys.intern(release),
+        flags=tuple(sys.intern(f) for f in flags if f not in GCLOUD_WIDE_FLAGS),
+        positionals=tuple(sys.intern(p) for p in positionals),
+        help_one_line=help_one_line,
+        rendered=rendered,
+    )
 
 # -----------------------------
 # Index builder
 # -----------------------------
 
+# First line of the first module/class docstring in a surface file; good
+# enough for a one-line command description without running gcloud.
+_DOCSTRING_HEAD_RE = re.compile(rb'(?:"""|\'\'\')\s*(.+)')
+
+# path -> one-line help gathered from surface-file docstrings during discovery
+SURFACE_HELP: Dict[str, str] = {}
+
+def _first_doc_line(source: bytes) -> str:
+    m = _DOCSTRING_HEAD_RE.search(source)
+    if not m:
+        return ""
+    line = m.group(1).decode("utf-8", "replace").strip()
+    return line.rstrip('"').rstrip("'").rstrip(".") + "." if line else ""
+
+def _discover_from_sdk_surface() -> List[str]:
+    """
+    Read leaf commands straight from the SDK's command tree on disk.
+    The Cloud SDK ships command definitions as Python modules under
+    $SDK_ROOT/lib/surface: directories are groups, non-dunder .py files are
+    leaf commands. A directory walk takes milliseconds versus ~1 s for the
+    'gcloud meta list-commands' subprocess.
+    """
+    sdk_root = gcloud_info_sdk_root()
+    if not sdk_root:
+        return []
+    surface = pathlib.Path(sdk_root) / "lib" / "surface"
+    if not surface.is_dir():
+        return []
+
+    cmds: List[str] = []
+    leaf_files: List[Tuple[str, pathlib.Path]] = []
+
+    def walk(dir_path: str, prefix: List[str]):
+        with os.scandir(dir_path) as it:
+            for entry in it:
+                name = entry.name
+                if name.startswith("_"):
+                    continue
+                if entry.is_dir(follow_symlinks=False):
+                    walk(entry.path, prefix + [name.replace("_", "-")])
+                elif name.endswith(".py"):
+                    path = " ".join(prefix + [name[:-3].replace("_", "-")])
+                    cmds.append(path)
+                    leaf_files.append((path, pathlib.Path(entry.path)))
+
+    walk(str(surface), [])
+
+    # Harvest one-line descriptions from the module docstrings while we're
+    # here. Hundreds of small reads are latency-bound, so batch them through
+    # a thread pool instead of issuing them one blocking read at a time.
+    def read_doc(item: Tuple[str, pathlib.Path]) -> Tuple[str, str]:
+        path, file_path = item
+        try:
+            return path, _first_doc_line(file_path.read_bytes())
+        except OSError:
+            return path, ""
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=64) as ex:
+        for path, doc in ex.map(read_doc, leaf_files):
+            if doc:
+                SURFACE_HELP[path] = doc
+
+    return sorted(set(cmds))
+
 def discover_command_list() -> List[str]:
     """
-    Prefer to ask gcloud for its full list of leaf commands.
-    Fallback: recursively parse 'gcloud help' (slower).
+    Prefer reading the SDK's surface tree from disk (no subprocess at all).
+    Fallbacks: ask gcloud for its command list, then recursively parse
+    'gcloud help' (slowest).
     """
+    # 0) Introspect $SDK_ROOT/lib/surface directly
+    cmds = _discover_from_sdk_surface()
+    if cmds:
+        return cmds
+
     # 1) Try 'gcloud meta list-commands'
     # (This is part of the Cloud SDK meta tooling; see fig.io docs)
     rc, out, _ = run(["gcloud", "meta", "list-commands"])
@@ -210,7 +420,7 @@ def discover_command_list() -> List[str]:
                 section = "commands"
                 continue
             if section in ("groups", "commands"):
-                m = re.match(r"\s+([a-z0-9\-]+)\s+.*", line)
+                m = _GROUP_LINE_RE.match(line)
                 if m:
                     (name,) = m.groups()
                     if section == "groups":
@@ -222,29 +432,37 @@ def discover_command_list() -> List[str]:
     visited = set()
     leaf_cmds: List[str] = []
 
-    def walk(prefix: List[str]):
-        key = " ".join(prefix)
-        if key in visited:
-            return
-        visited.add(key)
-        rc, out, _ = run(["gcloud", *prefix, "--help"], timeout=60)
-        if rc != 0:
-            return
-        groups, commands = parse_groups_and_commands(out)
-        for g in groups:
-            walk(prefix + [g])
-        for c in commands:
-            leaf_cmds.append(" ".join(prefix + [c]))
+    def fetch_help(prefix: Tuple[str, ...]) -> Tuple[Tuple[str, ...], int, str]:
+        rc, out, _ = run_help(list(prefix), timeout=60)
+        return prefix, rc, out
 
     # Start from top-level groups shown by `gcloud --help`
     rc_root, out_root, _ = run(["gcloud", "--help"])
+    frontier: List[Tuple[str, ...]] = []
     if rc_root == 0:
         root_groups, _ = (lambda t: (t[0], t[1]))(parse_groups_and_commands(out_root))
         for g in root_groups:
             # Skip alpha/beta groups for speed in fallback crawl
             if g in ("alpha", "beta"):
                 continue
-            walk([g])
+            frontier.append((g,))
+
+    # BFS level by level; each level's help fetches run concurrently so the
+    # crawl pays ~depth gcloud startups of latency instead of one per node.
+    with concurrent.futures.ThreadPoolExecutor(max_workers=MAX_HELP_WORKERS) as ex:
+        while frontier:
+            frontier = [p for p in frontier if " ".join(p) not in visited]
+            visited.update(" ".join(p) for p in frontier)
+            next_frontier: List[Tuple[str, ...]] = []
+            for prefix, rc, out in ex.map(fetch_help, frontier):
+                if rc != 0:
+                    continue
+                groups, commands = parse_groups_and_commands(out)
+                for g in groups:
+                    next_frontier.append(prefix + (g,))
+                for c in commands:
+                    leaf_cmds.append(" ".join(prefix + (c,)))
+            frontier = next_frontier
 
     return sorted(set(leaf_cmds))
 
@@ -254,11 +472,11 @@ def parse_help_for_command(path_tokens: List[str]) -> CommandSpec:
     """
     # Determine release level (alpha/beta/ga) heuristically: check if GA help exists first.
     release = "ga"
-    rc, out, _ = run(["gcloud", *path_tokens, "--help"], timeout=60)
+    rc, out, _ = run_help(path_tokens, timeout=60)
     if rc != 0:
         # Try beta then alpha
         for lvl in ("beta", "alpha"):
-            rc2, out2, _ = run(["gcloud", lvl, *path_tokens, "--help"], timeout=60)
+            rc2, out2, _ = run_help([lvl, *path_tokens], timeout=60)
             if rc2 == 0:
                 release = lvl
                 out = out2
@@ -266,23 +484,14 @@ def parse_help_for_command(path_tokens: List[str]) -> CommandSpec:
                 break
     if rc != 0:
         # As last resort, return minimal spec so at least the command path is real.
-        return CommandSpec(path=" ".join(path_tokens), release=release, flags=[], positionals=[], help_one_line="")
+        return _intern_spec_fields(" ".join(path_tokens), release, (), ())
 
-    # Extract first one-line description
-    help_one_line = ""
-    for line in out.splitlines():
-        line = line.strip()
-        if line and not line.startswith(("NAME", "SYNOPSIS", "USAGE")):
-            help_one_line = line
-            break
+    # Single pass over the help text: description, USAGE block, FLAGS
+    help_one_line, usage_block, flag_list = scan_help_sections(out)
 
     # Parse USAGE to guess positionals (UPPERCASE tokens commonly indicate placeholders)
     usage_pos: List[str] = []
-    usage_match = re.search(r"^USAGE\b.*?$([\s\S]+?)^\w", out, re.MULTILINE)
-    usage_block = ""
-    if usage_match:
-        usage_block = usage_match.group(1)
-    else:
+    if not usage_block:
         # Fall back: take first 'gcloud ...' line
         for line in out.splitlines():
             if line.strip().startswith("gcloud "):
@@ -297,7 +506,7 @@ def parse_help_for_command(path_tokens: List[str]) -> CommandSpec:
         if cmd_prefix in usage_block:
             usage_tail = usage_block.split(cmd_prefix, 1)[-1]
         # Find tokens like NAME, SERVICE, INSTANCE, ZONE, REGION, PROJECT_ID, etc.
-        for tok in re.findall(r"\b[A-Z][A-Z0-9_\-]*\b", usage_tail):
+        for tok in _UPPER_TOK_RE.findall(usage_tail):
             # Filter obvious keywords
             if tok in ("USAGE", "FLAGS", "ARGS", "AND", "OR"):
                 continue
@@ -306,35 +515,116 @@ def parse_help_for_command(path_tokens: List[str]) -> CommandSpec:
         seen = set()
         usage_pos = [x for x in usage_pos if not (x in seen or seen.add(x))]
 
-    # Parse "FLAGS" section for supported flags
-    flags: List[str] = []
-    flags_block_match = re.search(r"^FLAGS\b.*?$([\s\S]+?)^\w", out, re.MULTILINE)
-    if flags_block_match:
-        flags_block = flags_block_match.group(1)
-        for line in flags_block.splitlines():
-            m = re.match(r"\s+(--[a-z0-9][a-z0-9\-]*)\b", line.strip())
-            if m:
-                flags.append(m.group(1))
-    # Always allow gcloud-wide flags
-    flags = sorted(set(flags) | GCLOUD_WIDE_FLAGS)
-
-    return CommandSpec(
-        path=" ".join(path_tokens),
-        release=release,
-        flags=flags,
-        positionals=usage_pos,
+    # Gcloud-wide flags are implied by every spec; store only the specific ones
+    return _intern_spec_fields(
+        " ".join(path_tokens),
+        release,
+        sorted(set(flag_list)),
+        usage_pos,
         help_one_line=help_one_line,
     )
 
-def build_index(force: bool = False) -> Dict[str, CommandSpec]:
+def _encode_spec(spec: CommandSpec) -> bytes:
+    payload = spec.to_json_dict()
+    if orjson is not None:
+        return orjson.dumps(payload)
+    return json.dumps(payload).encode("utf-8")
+
+def _spec_from_fields(v: Dict) -> CommandSpec:
+    return _intern_spec_fields(
+        v["path"], v["release"], v["flags"], v["positionals"],
+        help_one_line=v.get("help_one_line", ""),
+        rendered=v.get("rendered", ""),
+    )
+
+def _decode_spec(data: bytes) -> CommandSpec:
+    raw = orjson.loads(data) if orjson is not None else json.loads(data)
+    return _spec_from_fields(raw)
+
+def _decode_index(data: bytes) -> Dict[str, CommandSpec]:
+    """Decode a legacy whole-index JSON blob."""
+    raw = orjson.loads(data) if orjson is not None else json.loads(data)
+    return {k: _spec_from_fields(v) for k, v in raw.items()}
+
+class SqliteIndex:
     """
-    Build (or load) an index of command -> spec.
+    Lazy, disk-backed command index. Opening it is one sqlite connect; specs
+    are decoded from their blobs only when actually looked at, and the
+    postings table answers token shortlists without touching spec blobs at
+    all. Keeps process RSS at the working set instead of the whole index.
     """
+
+    def __init__(self, db_path: pathlib.Path):
+        self._conn = sqlite3.connect(db_path)
+        self._cache: Dict[str, CommandSpec] = {}
+
+    def __iter__(self):
+        return (row[0] for row in self._conn.execute("SELECT path FROM specs"))
+
+    def __contains__(self, path: str) -> bool:
+        if path in self._cache:
+            return True
+        row = self._conn.execute("SELECT 1 FROM specs WHERE path = ?", (path,)).fetchone()
+        return row is not None
+
+    def __getitem__(self, path: str) -> CommandSpec:
+        spec = self._cache.get(path)
+        if spec is None:
+            row = self._conn.execute(
+                "SELECT blob FROM specs WHERE path = ?", (path,)
+            ).fetchone()
+            if row is None:
+                raise KeyError(path)
+            spec = _decode_spec(row[0])
+            self._cache[path] = spec
+        return spec
+
+    def shortlist(self, tokens: List[str]) -> List[str]:
+        """Paths sharing at least one token with the prompt, in one query."""
+        if not tokens:
+            return []
+        qmarks = ",".join("?" * len(tokens))
+        rows = self._conn.execute(
+            f"SELECT DISTINCT path FROM postings WHERE token IN ({qmarks})", tokens
+        )
+        return [r[0] for r in rows]
+
+# Either a fully materialized dict (fresh build) or the lazy sqlite view
+CommandIndex = Union[Dict[str, CommandSpec], SqliteIndex]
+
+def _save_index_db(index: Dict[str, CommandSpec]) -> None:
+    conn = sqlite3.connect(INDEX_DB_FILE)
+    with conn:
+        conn.execute("DROP TABLE IF EXISTS specs")
+        conn.execute("DROP TABLE IF EXISTS postings")
+        conn.execute("CREATE TABLE specs (path TEXT PRIMARY KEY, blob BLOB)")
+        conn.execute("CREATE TABLE postings (token TEXT, path TEXT)")
+        conn.execute("CREATE INDEX postings_token ON postings (token)")
+        conn.executemany(
+            "INSERT INTO specs VALUES (?, ?)",
+            ((p, _encode_spec(s)) for p, s in index.items()),
+        )
+        conn.executemany(
+            "INSERT INTO postings VALUES (?, ?)",
+            ((t, p) for p in index for t in set(p.split())),
+        )
+    conn.close()
+
+def build_index(force: bool = False) -> CommandIndex:
+    """
+    Build (or lazily open) the command index.
+
+    A previously built index is served straight from sqlite without loading
+    every spec into memory; a legacy JSON index is migrated on first sight.
+    """
+    if INDEX_DB_FILE.exists() and not force:
+        return SqliteIndex(INDEX_DB_FILE)
+
     if INDEX_FILE.exists() and not force:
-        with INDEX_FILE.open("r", encoding="utf-8") as f:
-            raw = json.load(f)
-        # Rehydrate dataclasses
-        return {k: CommandSpec(**v) for k, v in raw.items()}
+        # Migrate the legacy JSON index into the sqlite store
+        index = _decode_index(INDEX_FILE.read_bytes())
+        _save_index_db(index)
+        return SqliteIndex(INDEX_DB_FILE)
 
     # Discover commands (leaf paths)
     print("Discovering available gcloud commands...", file=sys.stderr)
@@ -354,18 +644,23 @@ def build_index(force: bool = False) -> Dict[str, CommandSpec]:
 
     index: Dict[str, CommandSpec] = {}
 
-    def add_path(p: str):
-        tokens = p.split()
-        spec = parse_help_for_command(tokens)
-        index[p] = spec
-
-    # Index prioritized first
-    for p in prioritized:
-        add_path(p)
+    # Index prioritized first; each path costs a gcloud startup, so fan the
+    # help fetches out over a thread pool instead of paying them serially.
+    with concurrent.futures.ThreadPoolExecutor(max_workers=MAX_HELP_WORKERS) as ex:
+        specs = ex.map(parse_help_for_command, (p.split() for p in prioritized))
+        for p, spec in zip(prioritized, specs):
+            index[p] = spec
+
+    # Post-pass: fill in descriptions harvested from surface docstrings where
+    # help parsing came up empty, and partial-evaluate the rendered command so
+    # the query path is a plain field read
+    for p, spec in index.items():
+        if not spec.help_one_line and SURFACE_HELP.get(p):
+            spec = dataclasses.replace(spec, help_one_line=SURFACE_HELP[p])
+        index[p] = dataclasses.replace(spec, rendered=_render(spec))
 
     # Persist partially built index to speed up future runs
-    with INDEX_FILE.open("w", encoding="utf-8") as f:
-        json.dump({k: dataclasses.asdict(v) for k, v in index.items()}, f, indent=2)
+    _save_index_db(index)
 
     # Store meta for reproducibility
     meta = {
@@ -382,48 +677,116 @@ def build_index(force: bool = False) -> Dict[str, CommandSpec]:
 # Matching & generation
 # -----------------------------
 
-def score_candidate(prompt_tokens: List[str], candidate_path: str) -> float:
+# Token-id registry for bitmask scoring. Prompt and path tokens share one id
+# namespace; each token set becomes an int bitmask so overlap is a single
+# AND + popcount instead of Python set allocations per candidate.
+_TOKEN_IDS: Dict[str, int] = {}
+VERBS = frozenset({"describe", "list", "create", "delete", "update", "deploy"})
+
+def _mask_for(tokens) -> int:
+    ids = _TOKEN_IDS
+    mask = 0
+    for t in tokens:
+        i = ids.get(t)
+        if i is None:
+            i = len(ids)
+            ids[t] = i
+        mask |= 1 << i
+    return mask
+
+_VERB_ALL_MASK = _mask_for(sorted(VERBS))
+
+# path -> (token_mask, verb_mask, token_count), filled as indexes are seen
+PATH_MASKS: Dict[str, Tuple[int, int, int]] = {}
+
+# token -> paths containing it (inverted index); only paths sharing at least
+# one token with the prompt can score well, so queries score this shortlist
+# instead of the whole index
+PATH_POSTINGS: Dict[str, List[str]] = {}
+
+def register_path_masks(paths: Iterable[str]) -> None:
+    """Precompute token/verb bitmasks and postings for every indexed path (idempotent)."""
+    for path in paths:
+        if path not in PATH_MASKS:
+            toks = path.split()
+            PATH_MASKS[path] = (
+                _mask_for(toks),
+                _mask_for(t for t in toks if t in VERBS),
+                len(toks),
+            )
+            for t in set(toks):
+                PATH_POSTINGS.setdefault(t, []).append(path)
+
+def score_candidate(prompt_mask: int, prompt_len: int, prompt_text: str, candidate_path: str) -> float:
     """
-    Compute a score for how well a command path matches the prompt tokens.
+    Score how well a command path matches the prompt bitmask.
     Heuristics:
     - Reward matching verb token (describe/list/create/delete/update/deploy).
-    - Reward overlapping resource/entity tokens.
-    - Light fuzzy factor for path vs phrase similarity.
+    - Reward overlapping resource/entity tokens (Jaccard over bitmasks).
+    - Fuzzy similarity via RapidFuzz's C implementation when installed,
+      otherwise a cheap token-count length prior.
     """
-    path_tokens = candidate_path.split()
-    # verb weighting
-    verbs = {"describe", "list", "create", "delete", "update", "deploy"}
-    prompt_verbs = verbs.intersection(prompt_tokens)
-    path_verb = [t for t in path_tokens if t in verbs]
+    token_mask, verb_mask, path_len = PATH_MASKS[candidate_path]
+    prompt_verb_mask = prompt_mask & _VERB_ALL_MASK
     verb_bonus = 0.0
-    if prompt_verbs and path_verb and (path_verb[0] in prompt_verbs):
-        verb_bonus = 0.5
-    elif path_verb and prompt_verbs:
-        verb_bonus = 0.35
+    if verb_mask and prompt_verb_mask:
+        verb_bonus = 0.5 if (verb_mask & prompt_verb_mask) else 0.35
 
     # resource/entity overlap (exclude verbs)
-    pt = set([t for t in prompt_tokens if t not in verbs])
-    ct = set([t for t in path_tokens if t not in verbs])
-    jacc = (len(pt & ct) / max(1, len(pt | ct)))
+    inter = (prompt_mask & token_mask & ~_VERB_ALL_MASK).bit_count()
+    union = ((prompt_mask | token_mask) & ~_VERB_ALL_MASK).bit_count()
+    jacc = inter / union if union else 0.0
 
-    # fuzzy similarity on joined strings
-    fuzzy = ratio(" ".join(prompt_tokens), candidate_path)
+    if _rf_fuzz is not None:
+        fuzzy = _rf_fuzz.ratio(prompt_text, candidate_path) / 100.0
+    else:
+        # shorter paths closer to the prompt's token count score a bit higher
+        fuzzy = 1.0 / (1.0 + abs(path_len - prompt_len))
 
     return 0.55 * jacc + 0.35 * fuzzy + verb_bonus
 
-def choose_candidates(index: Dict[str, CommandSpec], prompt: str, topk: int = 1) -> List[Tuple[CommandSpec, float]]:
-    tokens = canonicalize_tokens(tokenize(prompt))
-    scored: List[Tuple[CommandSpec, float]] = []
-    for path, spec in index.items():
-        scored.append((spec, score_candidate(tokens, path)))
+def choose_candidates(index: "CommandIndex", prompt: str, topk: int = 1) -> List[Tuple[CommandSpec, float]]:
+    tokens = tokenize_canon(prompt)
+    prompt_mask = _mask_for(tokens)
+    prompt_len = len(tokens)
+    prompt_text = " ".join(tokens)
+
+    # Shortlist via the inverted index (the sqlite view answers this in one
+    # query without decoding any specs); fall back to a full scan when no
+    # prompt token appears in any path (fuzzy-only ranking still applies)
+    if isinstance(index, SqliteIndex):
+        candidates = index.shortlist(tokens)
+        register_path_masks(candidates)
+    else:
+        register_path_masks(index)
+        shortlist = set()
+        for t in tokens:
+            shortlist.update(PATH_POSTINGS.get(t, ()))
+        candidates = [p for p in shortlist if p in index]
+    if not candidates:
+        candidates = list(index)
+        register_path_masks(candidates)
+
+    # Score paths first; specs are only materialized for the top-k results
+    scored = [
+        (path, score_candidate(prompt_mask, prompt_len, prompt_text, path))
+        for path in candidates
+    ]
     scored.sort(key=lambda x: x[1], reverse=True)
-    return scored[:topk]
+    return [(index[path], score) for path, score in scored[:topk]]
 
 def render_command(spec: CommandSpec) -> str:
     """
     Emit a syntactically correct command with placeholders for required bits.
     Only include flags that are (a) helpful and (b) supported by this command.
+    Specs carry their string pre-rendered from index build; rendering here is
+    only a fallback for specs built before that pass (and is memoized, since
+    the same spec is often chosen for many prompts).
     """
+    return spec.rendered or _render(spec)
+
+@functools.lru_cache(maxsize=1024)
+def _render(spec: CommandSpec) -> str:
     cmd = ["gcloud"]
     if spec.release in ("beta", "alpha"):
         cmd.append(spec.release)
@@ -437,7 +800,7 @@ def render_command(spec: CommandSpec) -> str:
     # Helpful commonly-required flags if the command supports them:
     preferred_flags = ["--region", "--zone", "--location", "--project"]
     for fl in preferred_flags:
-        if fl in spec.flags:
+        if spec.supports_flag(fl):
             # Use canonical placeholder names
             placeholder = {
                 "--region": "<REGION>",
@@ -448,7 +811,7 @@ def render_command(spec: CommandSpec) -> str:
             cmd.append(f"{fl}={placeholder}")
 
     # Always OK to suggest --format for machine-readable output
-    if "--format" in spec.flags and all(not a.startswith("--format") for a in cmd):
+    if spec.supports_flag("--format") and all(not a.startswith("--format") for a in cmd):
         cmd.append("--format=json")
 
     return " ".join(cmd)
@@ -467,19 +830,14 @@ def validate_command_string(cmd_str: str) -> Tuple[bool, str]:
         if t.startswith("--"):
             break
         base.append(t)
-    # Ask for help
-    rc, out, err = run(base + ["--help"], timeout=60)
+    # Ask for help (cached per SDK version)
+    rc, out, err = run_help(base[1:], timeout=60)
     if rc != 0:
         return False, f"gcloud help failed for {base!r}: {err or out}"
 
     # Collect legal flags
-    flags: set[str] = set(GCLOUD_WIDE_FLAGS)
-    flags_block = re.search(r"^FLAGS\b.*?$([\s\S]+?)^\w", out, re.MULTILINE)
-    if flags_block:
-        for line in flags_block.group(1).splitlines():
-            m = re.match(r"\s+(--[a-z0-9][a-z0-9\-]*)\b", line.strip())
-            if m:
-                flags.add(m.group(1))
+    _, _, help_flags = scan_help_sections(out)
+    flags: set[str] = set(GCLOUD_WIDE_FLAGS) | set(help_flags)
 
     # Check every flag we included is known
     unknown = []
@@ -543,7 +901,7 @@ def main():
         if spec.positionals:
             print(f"Positionals (from USAGE): {', '.join(spec.positionals[:5])}")
         # show a subset of flags
-        helpful = [f for f in spec.flags if f in {"--region","--zone","--location","--project","--format"}]
+        helpful = [f for f in ("--region","--zone","--location","--project","--format") if spec.supports_flag(f)]
         if helpful:
             print(f"Useful flags: {', '.join(helpful)}")
 